@@ -39,6 +39,10 @@ class Condition(object):
             internally, and won't usually be needed by a caller.
     """
 
+    __slots__ = ('_choice', '_choice_id', '_choice_matches', '_value_kwarg',
+                 '_operator', '_operator_id', '_value_field',
+                 '_value_field_loaded', 'value', 'raw_value')
+
     @classmethod
     def deserialize(cls, choices, data, condition_index=None,
                     choice_kwargs={}):
@@ -62,6 +66,60 @@ class Condition(object):
             djblets.conditions.conditions.Condition:
             The deserialized condition.
 
+        Raises:
+            djblets.conditions.errors.ConditionChoiceNotFoundError:
+                The choice ID referenced in the data was missing or did not
+                match a valid choice.
+
+            djblets.conditions.errors.ConditionOperatorNotFoundError:
+                The operator ID referenced in the data was missing or did not
+                match a valid operator for the choice.
+
+            djblets.conditions.errors.InvalidConditionValueError:
+                The value was missing from the payload data or was not valid
+                for the choice and operator.
+        """
+        return cls._deserialize(choices=choices,
+                                data=data,
+                                condition_index=condition_index,
+                                choice_kwargs=choice_kwargs,
+                                choice_cache={},
+                                operator_cache={})
+
+    @classmethod
+    def _deserialize(cls, choices, data, condition_index, choice_kwargs,
+                     choice_cache, operator_cache):
+        """Deserialize a condition, reusing previously-loaded state.
+
+        This does the work for :py:meth:`deserialize`. Choice and operator
+        instances are looked up in the provided caches before being loaded,
+        and newly-loaded instances are stored in the caches, allowing a
+        batch of conditions to share instances.
+
+        Args:
+            choices (djblets.conditions.choices.ConditionChoices):
+                Possible choices for the condition.
+
+            data (dict):
+                Serialized data representing this condition.
+
+            condition_index (int):
+                The index of the condition within the set of conditions.
+
+            choice_kwargs (dict):
+                Keyword arguments to pass when constructing a choice.
+
+            choice_cache (dict):
+                A cache mapping choice IDs to choice instances.
+
+            operator_cache (dict):
+                A cache mapping choice and operator ID pairs to operator
+                instances.
+
+        Returns:
+            djblets.conditions.conditions.Condition:
+            The deserialized condition.
+
         Raises:
             djblets.conditions.errors.ConditionChoiceNotFoundError:
                 The choice ID referenced in the data was missing or did not
@@ -76,9 +134,9 @@ class Condition(object):
                 for the choice and operator.
         """
         # Sanity-check that we have the data we expect.
-        try:
-            choice_id = data['choice']
-        except KeyError:
+        choice_id = data.get('choice')
+
+        if choice_id is None:
             logger.debug('Condition.deserialize: Missing "choice" key for '
                          'condition %r',
                          data)
@@ -87,9 +145,9 @@ class Condition(object):
                 _('A choice is required.'),
                 condition_index=condition_index)
 
-        try:
-            operator_id = data['op']
-        except KeyError:
+        operator_id = data.get('op')
+
+        if operator_id is None:
             logger.debug('Condition.deserialize: Missing "op" key for '
                          'condition %r',
                          data)
@@ -99,37 +157,48 @@ class Condition(object):
                 condition_index=condition_index)
 
         # Load the choice.
-        try:
-            choice = choices.get_choice(choice_id, choice_kwargs=choice_kwargs)
-        except ConditionChoiceNotFoundError as e:
-            logger.debug('Condition.deserialize: Invalid "choice" value '
-                         '"%s" for condition %r',
-                         choice_id, data)
+        choice = choice_cache.get(choice_id)
 
-            raise ConditionChoiceNotFoundError(
-                str(e),
-                choice_id=choice_id,
-                condition_index=condition_index)
+        if choice is None:
+            try:
+                choice = choices.get_choice(choice_id,
+                                            choice_kwargs=choice_kwargs)
+            except ConditionChoiceNotFoundError as e:
+                logger.debug('Condition.deserialize: Invalid "choice" value '
+                             '"%s" for condition %r',
+                             choice_id, data)
+
+                raise ConditionChoiceNotFoundError(
+                    str(e),
+                    choice_id=choice_id,
+                    condition_index=condition_index)
+
+            choice_cache[choice_id] = choice
 
         # Load the operator.
-        try:
-            operator = choice.get_operator(operator_id)
-        except ConditionOperatorNotFoundError as e:
-            logger.debug('Condition.deserialize: Invalid "op" value "%s" '
-                         'for condition %r',
-                         operator_id, data)
+        operator_key = (choice_id, operator_id)
+        operator = operator_cache.get(operator_key)
 
-            raise ConditionOperatorNotFoundError(
-                str(e),
-                operator_id=operator_id,
-                condition_index=condition_index)
+        if operator is None:
+            try:
+                operator = choice.get_operator(operator_id)
+            except ConditionOperatorNotFoundError as e:
+                logger.debug('Condition.deserialize: Invalid "op" value "%s" '
+                             'for condition %r',
+                             operator_id, data)
+
+                raise ConditionOperatorNotFoundError(
+                    str(e),
+                    operator_id=operator_id,
+                    condition_index=condition_index)
+
+            operator_cache[operator_key] = operator
 
         # Load the value.
-        if operator.value_field is not None:
-            try:
-                raw_value = data['value']
-                value = operator.value_field.deserialize_value(raw_value)
-            except KeyError:
+        value_field = operator.value_field
+
+        if value_field is not None:
+            if 'value' not in data:
                 logger.debug('Condition.deserialize: Missing "value" value '
                              'for condition %r',
                              data)
@@ -137,6 +206,11 @@ class Condition(object):
                 raise InvalidConditionValueError(
                     _('A value is required.'),
                     condition_index=condition_index)
+
+            raw_value = data['value']
+
+            try:
+                value = value_field.deserialize_value(raw_value)
             except InvalidConditionValueError as e:
                 logger.debug('Condition.deserialize: Invalid "value" value '
                              '%r for condition %r',
@@ -179,6 +253,58 @@ class Condition(object):
         else:
             self.raw_value = raw_value
 
+    @property
+    def choice(self):
+        """The choice stored for this condition.
+
+        Type:
+            djblets.conditions.choices.BaseConditionChoice
+        """
+        return self._choice
+
+    @choice.setter
+    def choice(self, choice):
+        """Set the choice stored for this condition.
+
+        This will also cache state from the choice needed when matching,
+        so that it doesn't need to be looked up for every match.
+
+        Args:
+            choice (djblets.conditions.choices.BaseConditionChoice):
+                The new choice for this condition.
+        """
+        self._choice = choice
+        self._choice_id = choice.choice_id
+        self._choice_matches = choice.matches
+        self._value_kwarg = choice.value_kwarg
+
+    @property
+    def operator(self):
+        """The operator stored for this condition.
+
+        Type:
+            djblets.conditions.operators.BaseConditionOperator
+        """
+        return self._operator
+
+    @operator.setter
+    def operator(self, operator):
+        """Set the operator stored for this condition.
+
+        This will also cache state from the operator needed when serializing,
+        so that it doesn't need to be looked up for every serialization. The
+        operator's value field is only computed the first time it's needed,
+        since it may be constructed on each access.
+
+        Args:
+            operator (djblets.conditions.operators.BaseConditionOperator):
+                The new operator for this condition.
+        """
+        self._operator = operator
+        self._operator_id = operator.operator_id
+        self._value_field = None
+        self._value_field_loaded = False
+
     def matches(self, value, value_state_cache=None):
         """Return whether a value matches the condition.
 
@@ -199,10 +325,10 @@ class Condition(object):
         if value_state_cache is None:
             value_state_cache = {}
 
-        return self.choice.matches(operator=self.operator,
-                                   match_value=value,
-                                   condition_value=self.value,
-                                   value_state_cache=value_state_cache)
+        return self._choice_matches(operator=self._operator,
+                                    match_value=value,
+                                    condition_value=self.value,
+                                    value_state_cache=value_state_cache)
 
     def serialize(self):
         """Serialize the condition to a JSON-serializable dictionary.
@@ -213,15 +339,21 @@ class Condition(object):
             serialized to JSON.
         """
         data = {
-            'choice': self.choice.choice_id,
-            'op': self.operator.operator_id,
+            'choice': self._choice_id,
+            'op': self._operator_id,
         }
 
-        if self.operator.value_field is not None:
-            if self.value is None:
-                value = None
-            else:
-                value = self.operator.value_field.serialize_value(self.value)
+        if not self._value_field_loaded:
+            self._value_field = self._operator.value_field
+            self._value_field_loaded = True
+
+        value_field = self._value_field
+
+        if value_field is not None:
+            value = self.value
+
+            if value is not None:
+                value = value_field.serialize_value(value)
 
             data['value'] = value
 
@@ -261,18 +393,42 @@ class ConditionSet(object):
     #: Any condition may match a value to satisfy the condition set.
     MODE_ANY = 'any'
 
+    #: A mapping of modes to the names of the methods used to match values.
+    #:
+    #: This is used both to validate modes and to choose the matching
+    #: implementation for a mode.
+    _MODE_IMPLS = {
+        MODE_ALWAYS: '_match_always',
+        MODE_ALL: '_match_all',
+        MODE_ANY: '_match_any',
+    }
+
     #: A set of all the valid modes.
-    CONDITIONS = (MODE_ALWAYS, MODE_ALL, MODE_ANY)
+    CONDITIONS = tuple(_MODE_IMPLS)
 
     #: The default mode.
     DEFAULT_MODE = MODE_ALL
 
+    __slots__ = ('_mode', '_match_impl', 'conditions')
+
     @classmethod
     def deserialize(cls, choices, data, choice_kwargs={}):
         """Deserialize a set of conditions from serialized data.
 
         This expects data serialized by :py:meth:`deserialize`.
 
+        Conditions that reference the same choice ID will share a single
+        choice instance, and conditions that reference the same choice and
+        operator IDs will share a single operator instance. Changes made to
+        the state of one condition's choice or operator will be visible to
+        the other conditions sharing it.
+
+        Version Changed:
+            5.0:
+            Choice and operator instances are now shared between conditions
+            in the set. Previously, each condition was given its own
+            instances.
+
         Args:
             choices (djblets.conditions.choices.ConditionChoices):
                 Possible choices for the condition set.
@@ -302,21 +458,69 @@ class ConditionSet(object):
         """
         mode = data.get('mode')
 
-        if mode not in cls.CONDITIONS:
+        try:
+            cls._get_match_impl_name(mode)
+        except InvalidConditionModeError:
             logger.debug('ConditionSet.deserialize: Invalid "mode" value '
                          '"%s" for condition set %r',
                          mode, data)
 
-            raise InvalidConditionModeError(
-                _('"%s" is not a valid condition mode.')
-                % mode)
+            raise
+
+        return cls(mode, cls._deserialize_batch(choices,
+                                                data.get('conditions', []),
+                                                choice_kwargs))
+
+    @classmethod
+    def _deserialize_batch(cls, choices, conditions_data, choice_kwargs):
+        """Deserialize a list of conditions.
+
+        Choice and operator instances are shared across all conditions
+        referencing the same IDs, so each is only looked up and constructed
+        once for the batch.
+
+        Args:
+            choices (djblets.conditions.choices.ConditionChoices):
+                Possible choices for the conditions.
+
+            conditions_data (list of dict):
+                Serialized data representing each condition.
+
+            choice_kwargs (dict):
+                Keyword arguments to pass when constructing a choice.
 
-        return cls(mode, [
-            Condition.deserialize(choices, condition_data, i, choice_kwargs)
-            for i, condition_data in enumerate(data.get('conditions', []))
-        ])
+        Returns:
+            list of Condition:
+            The deserialized conditions.
+
+        Raises:
+            djblets.conditions.errors.ConditionChoiceNotFoundError:
+                The choice ID referenced in the data was missing or did not
+                match a valid choice in a condition.
+
+            djblets.conditions.errors.ConditionOperatorNotFoundError:
+                The operator ID referenced in the data was missing or did not
+                match a valid operator for the choice in a condition.
 
-    def __init__(self, mode=DEFAULT_MODE, conditions=[]):
+            djblets.conditions.errors.InvalidConditionValueError:
+                The value was missing from the payload data or was not valid
+                for the choice and operator in a condition.
+        """
+        choice_cache = {}
+        operator_cache = {}
+        deserialize_condition = Condition._deserialize
+
+        return [
+            deserialize_condition(choices=choices,
+                                  data=condition_data,
+                                  condition_index=i,
+                                  choice_kwargs=choice_kwargs,
+                                  choice_cache=choice_cache,
+                                  operator_cache=operator_cache)
+            for i, condition_data in enumerate(conditions_data)
+        ]
+
+    def __init__(self, mode=DEFAULT_MODE, conditions=None):
         """Initialize the condition set.
 
         Args:
@@ -331,13 +535,41 @@ class ConditionSet(object):
             djblets.conditions.errors.InvalidConditionModeError:
                 The match mode is not a valid mode.
         """
-        if mode not in self.CONDITIONS:
-            raise InvalidConditionModeError(
-                _('"%s" is not a valid condition mode.')
-                % mode)
-
         self.mode = mode
-        self.conditions = conditions
+
+        if conditions is None:
+            self.conditions = []
+        else:
+            self.conditions = conditions
+
+    @property
+    def mode(self):
+        """The matching mode for the condition set.
+
+        Setting a new mode will validate it and update the matching
+        implementation used by :py:meth:`matches`.
+
+        Type:
+            unicode
+        """
+        return self._mode
+
+    @mode.setter
+    def mode(self, mode):
+        """Set the matching mode for the condition set.
+
+        Args:
+            mode (unicode):
+                The new match mode.
+
+        Raises:
+            djblets.conditions.errors.InvalidConditionModeError:
+                The match mode is not a valid mode.
+        """
+        match_impl = getattr(self, self._get_match_impl_name(mode))
+
+        self._mode = mode
+        self._match_impl = match_impl
 
     def matches(self, **values):
         """Check if a value matches the condition set.
@@ -345,6 +577,9 @@ class ConditionSet(object):
         Depending on the mode of the condition set, this will either require
         all conditions to match, or only one.
 
+        If a condition expects a particular value that's not provided in
+        ``values``, it will evaluate as a false match.
+
         Args:
             **values (dict):
                 Values to match against. By default, condition choices
@@ -357,19 +592,7 @@ class ConditionSet(object):
             ``True`` if the value fulfills the condition set. ``False`` if it
             does not.
         """
-        if self.mode == self.MODE_ALWAYS:
-            match_conditions = lambda x: True
-        elif self.mode == self.MODE_ALL:
-            match_conditions = self._match_all
-        elif self.mode == self.MODE_ANY:
-            match_conditions = any
-        else:
-            # We shouldn't be here, unless someone set the mode to a bad value
-            # after creating the condition set.
-            raise ValueError('Invalid condition mode %r' % self.mode)
-
-        return match_conditions(self._get_condition_results(self.conditions,
-                                                            values))
+        return self._match_impl(values)
 
     def serialize(self):
         """Serialize the condition set to a JSON-serializable dictionary.
@@ -390,58 +613,104 @@ class ConditionSet(object):
     # Make this serializable in a DjbletsJSONEncoder.
     to_json = serialize
 
-    def _get_condition_results(self, conditions, values):
-        """Yield the results from each condition match.
+    @classmethod
+    def _get_match_impl_name(cls, mode):
+        """Return the name of the matching method for a mode.
 
-        This will iterate through all the conditions, running a match against
-        the provided values, yielding each result.
+        Args:
+            mode (unicode):
+                The match mode.
 
-        If a condition expects a particular value that's not provided in
-        ``values``, it will evaluate as a false match.
+        Returns:
+            unicode:
+            The name of the method used to match values for the mode.
+
+        Raises:
+            djblets.conditions.errors.InvalidConditionModeError:
+                The match mode is not a valid mode.
+        """
+        if isinstance(mode, str):
+            match_impl_name = cls._MODE_IMPLS.get(mode)
+        else:
+            match_impl_name = None
+
+        if match_impl_name is None:
+            raise InvalidConditionModeError(
+                _('"%s" is not a valid condition mode.')
+                % mode)
+
+        return match_impl_name
+
+    def _match_always(self, values):
+        """Return a match for any values.
+
+        This is used for :py:attr:`MODE_ALWAYS`.
 
         Args:
-            conditions (list of djblets.conditions.condition.Condition):
-                The conditions to iterate through.
+            values (dict):
+                The dictionary of values to match against. This is unused.
+
+        Returns:
+            bool:
+            ``True``, always.
+        """
+        return True
+
+    def _match_all(self, values):
+        """Return whether all conditions match the provided values.
+
+        This is used for :py:attr:`MODE_ALL`. It works similarly to
+        :py:func:`all`, but will return ``False`` if there are no conditions
+        in the set. Matching stops at the first condition that fails.
 
+        Args:
             values (dict):
                 The dictionary of values to match against.
 
-        Yields:
+        Returns:
             bool:
-            The result of each condition match.
+            ``True`` if there are conditions present and they all match.
+            ``False`` otherwise.
         """
+        conditions = self.conditions
+
+        if not conditions:
+            return False
+
         value_state_cache = {}
 
         for condition in conditions:
-            value_kwarg = condition.choice.value_kwarg
+            value_kwarg = condition._value_kwarg
+
+            if (value_kwarg not in values or
+                not condition.matches(values[value_kwarg],
+                                      value_state_cache=value_state_cache)):
+                return False
 
-            if value_kwarg in values:
-                yield condition.matches(values[value_kwarg],
-                                        value_state_cache=value_state_cache)
-            else:
-                yield False
+        return True
 
-    def _match_all(self, results):
-        """Return whether all results are truthy and the list is non-empty.
+    def _match_any(self, values):
+        """Return whether any condition matches the provided values.
 
-        This works similarly to :py:func:`all`, but will return ``False`` if
-        the provided list is empty.
+        This is used for :py:attr:`MODE_ANY`. Matching stops at the first
+        condition that succeeds.
 
         Args:
-            results (generator):
-                The condition results to iterate through.
+            values (dict):
+                The dictionary of values to match against.
 
         Returns:
             bool:
-            ``True`` if there are condition results present and they all
-            evaluate to ``True``. ``False`` otherwise.
+            ``True`` if at least one condition matches. ``False`` otherwise.
         """
-        found = False
+        value_state_cache = {}
 
-        for result in results:
-            if not result:
-                return False
+        for condition in self.conditions:
+            value_kwarg = condition._value_kwarg
 
-            found = True
+            if (value_kwarg in values and
+                condition.matches(values[value_kwarg],
+                                  value_state_cache=value_state_cache)):
+                return True
 
-        return found
+        return False
@@ -1,3 +1,6 @@
+import copy
+import pickle
+
 from django import forms
 from kgb import SpyAgency
 
@@ -148,6 +151,24 @@ class ConditionTests(SpyAgency, TestCase):
         self.assertEqual(str(e), 'A choice is required.')
         self.assertEqual(e.condition_index, 1)
 
+    def test_deserialize_with_null_choice(self):
+        """Testing Condition.deserialize with null choice in data"""
+        choices = ConditionChoices()
+
+        with self.assertRaises(ConditionChoiceNotFoundError) as cm:
+            Condition.deserialize(
+                choices,
+                {
+                    'choice': None,
+                    'op': 'my-op',
+                    'value': 'my-value',
+                },
+                condition_index=1)
+
+        e = cm.exception
+        self.assertEqual(str(e), 'A choice is required.')
+        self.assertEqual(e.condition_index, 1)
+
     def test_deserialize_with_missing_operator(self):
         """Testing Condition.deserialize with missing operator in data"""
         choices = ConditionChoices()
@@ -287,6 +308,90 @@ class ConditionTests(SpyAgency, TestCase):
                 'op': 'basic-test-op',
             })
 
+    def test_serialize_after_changing_operator(self):
+        """Testing Condition.serialize after changing operator"""
+        class MyChoice(BaseConditionChoice):
+            choice_id = 'my-choice'
+            operators = ConditionOperators([BasicTestOperator,
+                                            NoValueTestOperator])
+            default_value_field = ConditionValueFormField(forms.IntegerField())
+
+        choice = MyChoice()
+        condition = Condition(choice, choice.get_operator('basic-test-op'),
+                              123)
+        self.assertEqual(
+            condition.serialize(),
+            {
+                'choice': 'my-choice',
+                'op': 'basic-test-op',
+                'value': 123,
+            })
+
+        condition.operator = choice.get_operator('no-value-test-op')
+
+        self.assertEqual(
+            condition.serialize(),
+            {
+                'choice': 'my-choice',
+                'op': 'no-value-test-op',
+            })
+
+    def test_serialize_computes_value_field_once(self):
+        """Testing Condition.serialize only computes the operator's value
+        field once
+        """
+        class MyChoice(BaseConditionChoice):
+            choice_id = 'my-choice'
+            operators = ConditionOperators([BasicTestOperator])
+
+            def default_value_field(self, **kwargs):
+                return ConditionValueFormField(forms.IntegerField())
+
+        choice = MyChoice()
+        self.spy_on(choice.default_value_field)
+
+        condition = Condition(choice, choice.get_operator('basic-test-op'),
+                              123)
+        self.assertSpyNotCalled(choice.default_value_field)
+
+        expected_data = {
+            'choice': 'my-choice',
+            'op': 'basic-test-op',
+            'value': 123,
+        }
+
+        self.assertEqual(condition.serialize(), expected_data)
+        self.assertEqual(condition.serialize(), expected_data)
+        self.assertSpyCallCount(choice.default_value_field, 1)
+
+    def test_serialize_after_deepcopy(self):
+        """Testing Condition.serialize after copy.deepcopy"""
+        choice = BasicTestChoice()
+        condition = Condition(choice, choice.get_operator('basic-test-op'),
+                              'abc123')
+
+        self.assertEqual(
+            copy.deepcopy(condition).serialize(),
+            {
+                'choice': 'basic-test-choice',
+                'op': 'basic-test-op',
+                'value': 'abc123',
+            })
+
+    def test_serialize_after_pickle(self):
+        """Testing Condition.serialize after pickling and unpickling"""
+        choice = BasicTestChoice()
+        condition = Condition(choice, choice.get_operator('basic-test-op'),
+                              'abc123')
+
+        self.assertEqual(
+            pickle.loads(pickle.dumps(condition)).serialize(),
+            {
+                'choice': 'basic-test-choice',
+                'op': 'basic-test-op',
+                'value': 'abc123',
+            })
+
     def test_matches_with_match(self):
         """Testing Condition.matches with match"""
         choice = EqualsTestChoice()
@@ -301,6 +406,20 @@ class ConditionTests(SpyAgency, TestCase):
                               'abc123')
         self.assertFalse(condition.matches('def123'))
 
+    def test_matches_after_changing_choice(self):
+        """Testing Condition.matches after changing choice"""
+        class CustomEqualsChoice(EqualsTestChoice):
+            def get_match_value(self, value, **kwargs):
+                return value.upper()
+
+        choice = EqualsTestChoice()
+        condition = Condition(choice, choice.get_operator('equals-test-op'),
+                              'ABC123')
+        self.assertFalse(condition.matches('abc123'))
+
+        condition.choice = CustomEqualsChoice()
+        self.assertTrue(condition.matches('abc123'))
+
 
 class ConditionSetTests(TestCase):
     """Unit tests for djblets.conditions.conditions.ConditionSet."""
@@ -354,6 +473,44 @@ class ConditionSetTests(TestCase):
         self.assertEqual(choice.choice_id, 'basic-test-choice')
         self.assertEqual(choice.extra_state, {'abc': 123})
 
+    def test_deserialize_with_shared_choices(self):
+        """Testing ConditionSet.deserialize with multiple conditions sharing
+        choices and operators
+        """
+        choices = ConditionChoices([BasicTestChoice, EqualsTestChoice])
+
+        condition_set = ConditionSet.deserialize(
+            choices,
+            {
+                'mode': 'all',
+                'conditions': [
+                    {
+                        'choice': 'basic-test-choice',
+                        'op': 'basic-test-op',
+                        'value': 'value1',
+                    },
+                    {
+                        'choice': 'equals-test-choice',
+                        'op': 'equals-test-op',
+                        'value': 'value2',
+                    },
+                    {
+                        'choice': 'basic-test-choice',
+                        'op': 'basic-test-op',
+                        'value': 'value3',
+                    },
+                ],
+            })
+
+        conditions = condition_set.conditions
+        self.assertEqual(len(conditions), 3)
+        self.assertIs(conditions[0].choice, conditions[2].choice)
+        self.assertIs(conditions[0].operator, conditions[2].operator)
+        self.assertIsNot(conditions[0].choice, conditions[1].choice)
+        self.assertIsInstance(conditions[1].choice, EqualsTestChoice)
+        self.assertEqual([condition.value for condition in conditions],
+                         ['value1', 'value2', 'value3'])
+
     def test_deserialize_with_invalid_mode(self):
         """Testing ConditionSet.deserialize with invalid mode"""
         choices = ConditionChoices([BasicTestChoice])
@@ -372,6 +529,39 @@ class ConditionSetTests(TestCase):
                     ],
                 })
 
+    def test_deserialize_with_non_string_mode(self):
+        """Testing ConditionSet.deserialize with non-string mode"""
+        choices = ConditionChoices([BasicTestChoice])
+
+        with self.assertRaises(InvalidConditionModeError):
+            ConditionSet.deserialize(
+                choices,
+                {
+                    'mode': ['all'],
+                    'conditions': [],
+                })
+
+    def test_init_with_all_modes(self):
+        """Testing ConditionSet.__init__ with each mode in CONDITIONS"""
+        for mode in ConditionSet.CONDITIONS:
+            condition_set = ConditionSet(mode)
+            self.assertEqual(condition_set.mode, mode)
+
+    def test_init_with_default_conditions(self):
+        """Testing ConditionSet.__init__ with default conditions creates a
+        new list for each instance
+        """
+        choice = EqualsTestChoice()
+
+        condition_set1 = ConditionSet()
+        condition_set2 = ConditionSet()
+
+        condition_set1.conditions.append(
+            Condition(choice, choice.get_operator('equals-test-op'),
+                      'abc123'))
+
+        self.assertEqual(condition_set2.conditions, [])
+
     def test_matches_with_always_mode(self):
         """Testing ConditionSet.matches with "always" mode"""
         condition_set = ConditionSet(ConditionSet.MODE_ALWAYS, [])
@@ -421,6 +611,59 @@ class ConditionSetTests(TestCase):
 
         self.assertFalse(condition_set.matches(value='foo'))
 
+    def test_matches_with_all_mode_and_no_conditions(self):
+        """Testing ConditionSet.matches with "all" mode and no conditions"""
+        condition_set = ConditionSet(ConditionSet.MODE_ALL, [])
+        self.assertFalse(condition_set.matches(value='abc123'))
+
+    def test_matches_after_changing_mode(self):
+        """Testing ConditionSet.matches after changing mode"""
+        choice = EqualsTestChoice()
+
+        condition_set = ConditionSet(ConditionSet.MODE_ALL, [
+            Condition(choice, choice.get_operator('equals-test-op'), 'abc123'),
+            Condition(choice, choice.get_operator('equals-test-op'), 'def123'),
+        ])
+        self.assertFalse(condition_set.matches(value='abc123'))
+
+        condition_set.mode = ConditionSet.MODE_ANY
+        self.assertTrue(condition_set.matches(value='abc123'))
+
+    def test_set_mode_with_invalid_mode(self):
+        """Testing ConditionSet.mode with setting invalid mode"""
+        condition_set = ConditionSet()
+
+        with self.assertRaises(InvalidConditionModeError):
+            condition_set.mode = 'invalid'
+
+        self.assertEqual(condition_set.mode, ConditionSet.MODE_ALL)
+
+    def test_matches_with_condition_subclass(self):
+        """Testing ConditionSet.matches with a Condition subclass overriding
+        matches()
+        """
+        class NegatedCondition(Condition):
+            def matches(self, *args, **kwargs):
+                return not super().matches(*args, **kwargs)
+
+        choice = EqualsTestChoice()
+        condition = NegatedCondition(choice,
+                                     choice.get_operator('equals-test-op'),
+                                     'abc123')
+
+        self.assertTrue(
+            ConditionSet(ConditionSet.MODE_ALL, [condition])
+            .matches(value='def123'))
+        self.assertFalse(
+            ConditionSet(ConditionSet.MODE_ALL, [condition])
+            .matches(value='abc123'))
+        self.assertTrue(
+            ConditionSet(ConditionSet.MODE_ANY, [condition])
+            .matches(value='def123'))
+        self.assertFalse(
+            ConditionSet(ConditionSet.MODE_ANY, [condition])
+            .matches(value='abc123'))
+
     def test_matches_with_custom_value_kwargs(self):
         """Testing ConditionSet.matches with custom value keyword arguments"""
         class CustomEqualsChoice(EqualsTestChoice):
@@ -525,3 +768,28 @@ class ConditionSetTests(TestCase):
                     },
                 ],
             })
+
+    def test_serialize_after_deepcopy_and_pickle(self):
+        """Testing ConditionSet.serialize after copy.deepcopy and pickling"""
+        choice = BasicTestChoice()
+        condition_set = ConditionSet(ConditionSet.MODE_ANY, [
+            Condition(choice, choice.get_operator('basic-test-op'),
+                      'abc123'),
+        ])
+
+        expected_data = {
+            'mode': 'any',
+            'conditions': [
+                {
+                    'choice': 'basic-test-choice',
+                    'op': 'basic-test-op',
+                    'value': 'abc123',
+                },
+            ],
+        }
+
+        self.assertEqual(copy.deepcopy(condition_set).serialize(),
+                         expected_data)
+        self.assertEqual(
+            pickle.loads(pickle.dumps(condition_set)).serialize(),
+            expected_data)